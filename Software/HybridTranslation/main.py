@@ -3,7 +3,11 @@ import os
 import random
 import json
 import asyncio
-import difflib
+import bisect
+import threading
+import queue
+import re
+from collections import OrderedDict, deque
 import pyttsx3  # For text-to-speech
 
 from PyQt6.QtWidgets import (
@@ -12,10 +16,26 @@ from PyQt6.QtWidgets import (
     QSlider, QTextEdit, QSpinBox, QFileDialog, QComboBox, QTabWidget,
     QCheckBox, QFrame, QMessageBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal, QObject
+import numpy as np
+from rapidfuzz import fuzz, process
 
-# Import googletrans (ensure version 4.0.0-rc1 is installed)
+# Import googletrans (ensure version 4.0.2+ with the async API is installed)
 from googletrans import Translator, LANGUAGES
+import httpx
+
+try:
+    import orjson  # Optional: faster JSON export.
+except ImportError:
+    orjson = None
+
+# Lookup tables for parse_language, built once at import time.
+_NAME_TO_CODE = {}
+for _code, _name in LANGUAGES.items():
+    _NAME_TO_CODE.setdefault(_name.lower(), _code)
+_SORTED_NAMES = sorted((name.lower(), code) for code, name in LANGUAGES.items())
+# Language codes for random rounds, materialized once.
+_LANG_CODES = tuple(LANGUAGES.keys())
 
 # --- Helper: Parse language input (accepts code, full name, or unique prefix) ---
 def parse_language(input_str):
@@ -26,13 +46,14 @@ def parse_language(input_str):
     if s in LANGUAGES:
         return s
     # Full language name match.
-    for code, name in LANGUAGES.items():
-        if s == name.lower():
-            return code
-    # Check if s is a unique prefix.
-    matches = [code for code, name in LANGUAGES.items() if name.lower().startswith(s)]
-    if len(matches) == 1:
-        return matches[0]
+    code = _NAME_TO_CODE.get(s)
+    if code is not None:
+        return code
+    # Check if s is a unique prefix: names starting with s sort contiguously from bisect_left.
+    idx = bisect.bisect_left(_SORTED_NAMES, (s, ""))
+    if idx < len(_SORTED_NAMES) and _SORTED_NAMES[idx][0].startswith(s):
+        if idx + 1 == len(_SORTED_NAMES) or not _SORTED_NAMES[idx + 1][0].startswith(s):
+            return _SORTED_NAMES[idx][1]
     # Allow common abbreviations.
     mapping = {
         "eng": "en",
@@ -46,100 +67,325 @@ def parse_language(input_str):
         return mapping[s]
     return None
 
+# Number of past runs kept in the History tab.
+_HISTORY_SIZE = 200
+
+# --- Process-wide translation cache: (source_text, dest_lang) -> (text, pronunciation) ---
+_TRANSLATION_CACHE_SIZE = 4096
+_TRANSLATION_CACHE = OrderedDict()
+_TRANSLATION_CACHE_LOCK = threading.Lock()  # Only the loop thread touches the cache today; kept as cheap insurance.
+
+def cache_get(text, dest):
+    key = (text, dest)
+    with _TRANSLATION_CACHE_LOCK:
+        hit = _TRANSLATION_CACHE.get(key)
+        if hit is not None:
+            _TRANSLATION_CACHE.move_to_end(key)
+        return hit
+
+def cache_put(text, dest, translated, pronunciation):
+    with _TRANSLATION_CACHE_LOCK:
+        _TRANSLATION_CACHE[(text, dest)] = (translated, pronunciation)
+        _TRANSLATION_CACHE.move_to_end((text, dest))
+        # Evict least recently used entries.
+        while len(_TRANSLATION_CACHE) > _TRANSLATION_CACHE_SIZE:
+            _TRANSLATION_CACHE.popitem(last=False)
+
+# Upper bound on concurrent translate() requests, to stay within Google's rate limits.
+_MAX_CONCURRENT_ROUNDS = 8
+
+# --- Helper: Translate through the shared cache (runs on the background loop) ---
+async def translate_cached(translator, text, target_lang, source_lang=None):
+    # Returns (translated_text, pronunciation), consulting the shared cache first.
+    if target_lang == source_lang:
+        # Text is already in the target language (previous round's destination): identity round.
+        return text, "N/A"
+    cached = cache_get(text, target_lang)
+    if cached is not None:
+        # Cache hit: reuse the earlier translation without a network round-trip.
+        return cached
+    result = await translator.translate(text, dest=target_lang)
+    # Use the pronunciation provided by the result if available.
+    pron = result.pronunciation if result.pronunciation else "N/A"
+    cache_put(text, target_lang, result.text, pron)
+    return result.text, pron
+
+# --- Helper: Split streamed text into speakable sentences ---
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)")
+
+class SentenceBuffer:
+    ABBREVIATIONS = {"Dr", "Mr", "Mrs", "PM"}
+    MIN_LENGTH = 10  # Shorter fragments are held back and merged with the next sentence.
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        # Returns the sentences completed by text; the unfinished remainder stays buffered.
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self.buffer):
+            words = self.buffer[start:match.start()].split()
+            # "Dr." and friends end a word, not a sentence.
+            if words and words[-1] in self.ABBREVIATIONS and match.group().startswith("."):
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            if len(sentence) < self.MIN_LENGTH:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        # Returns whatever is left as a final sentence.
+        sentence = self.buffer.strip()
+        self.buffer = ""
+        return [sentence] if sentence else []
+
+# --- Persistent asyncio loop, shared by every translation run ---
+class AsyncLoopThread(QThread):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loop = asyncio.new_event_loop()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _shutdown(self, translator):
+        # Cancel runs still in flight, then close the HTTP client while the loop can still drive it.
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if translator is not None:
+            await translator.client.aclose()
+
+    def stop(self, translator=None):
+        if self.isRunning():
+            future = asyncio.run_coroutine_threadsafe(self._shutdown(translator), self.loop)
+            try:
+                future.result(timeout=5)
+            except Exception:
+                pass  # Closing is best effort; never hold up window close.
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.wait()
+        self.loop.close()
+
+# Connection pool for the shared Translator; sized above _MAX_CONCURRENT_ROUNDS.
+_HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+
+# --- Helper: Build a Translator whose HTTP client multiplexes concurrent rounds ---
+def create_translator(loop):
+    translator = Translator()
+    # googletrans does not expose pool limits, so swap in an equivalent client that has them
+    # (it already builds an HTTP/2 client; httpx[http2] is one of its dependencies).
+    default_client = translator.client
+    translator.client = httpx.AsyncClient(
+        http2=True,
+        limits=_HTTP_LIMITS,
+        headers=default_client.headers,
+        timeout=default_client.timeout,
+    )
+    # The token lookup holds its own reference to the client; move it over before closing the old one.
+    translator.token_acquirer.client = translator.client
+    asyncio.run_coroutine_threadsafe(default_client.aclose(), loop).result()
+    return translator
+
 # --- Worker for asynchronous translation chain ---
 class TranslationWorker(QObject):
     # Each chain element: (round_number, language_code, translated_text, pronunciation)
     finished = pyqtSignal(list, str)   # Emits (chain_list, final_output)
-    progress = pyqtSignal(list)          # Emits current chain list (live update)
+    progress = pyqtSignal(tuple)         # Emits each newly completed chain element (live update)
     error = pyqtSignal(str)
+    sentence_ready = pyqtSignal(str)     # Emits translated sentences for streaming speech
 
-    def __init__(self, original_text, language_chain, num_rounds, freq_value):
+    def __init__(self, original_text, language_chain, num_rounds, freq_value, translator, speak_rounds=False):
         """
         original_text: the text to translate.
         language_chain: ordered list of language codes from fixed slots.
-        num_rounds: total rounds (if > len(language_chain), extra rounds use random languages).
+        num_rounds: total rounds (if > len(language_chain), extra rounds use random languages
+                    and are translated concurrently from the last fixed-slot output).
         freq_value: 0-100; determines final output selection based on similarity.
                    0 = most similar (minimal change), 100 = most different.
+        translator: shared Translator instance, reused across runs to keep connections pooled.
+        speak_rounds: if True, emit sentence_ready for each sentence of every translated round.
         """
         super().__init__()
         self.original_text = original_text
         self.language_chain = language_chain
         self.num_rounds = num_rounds
         self.freq_value = freq_value
+        self.translator = translator
+        self.speak_rounds = speak_rounds
 
-    def run(self):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    def start(self, loop):
+        # Schedule the chain on the shared background loop; signals are queued to the GUI thread.
+        future = asyncio.run_coroutine_threadsafe(self.async_translate_chain(), loop)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
         try:
-            chain, final_output = loop.run_until_complete(self.async_translate_chain())
-            self.finished.emit(chain, final_output)
+            chain, final_output = future.result()
         except Exception as ex:
             self.error.emit(str(ex))
-        finally:
-            loop.close()
+            return
+        self.finished.emit(chain, final_output)
+
+    def emit_sentences(self, text):
+        if not self.speak_rounds:
+            return
+        buffer = SentenceBuffer()
+        for sentence in buffer.feed(text) + buffer.flush():
+            self.sentence_ready.emit(sentence)
 
     async def async_translate_chain(self):
-        translator = Translator()
+        translator = self.translator
         chain = []  # Each element: (round_number, language_code, translated_text, pronunciation)
         current_text = self.original_text
+        current_lang = None  # Language current_text is known to be in (unknown for the input).
 
         # Round 0: Original text (no pronunciation available; shown as N/A)
         chain.append((0, "auto", current_text, "N/A"))
-        total_rounds = self.num_rounds
+        self.progress.emit(chain[-1])
+        fixed_rounds = min(self.num_rounds, len(self.language_chain))
+        failed = False
 
-        for i in range(1, total_rounds + 1):
-            # Use fixed slot language if available; otherwise, choose a random language.
-            if i <= len(self.language_chain):
-                target_lang = self.language_chain[i - 1]
-            else:
-                target_lang = random.choice(list(LANGUAGES.keys()))
+        # Fixed slot rounds are sequential: each one translates the previous round's output.
+        for i in range(1, fixed_rounds + 1):
+            target_lang = self.language_chain[i - 1]
             try:
-                result = await translator.translate(current_text, dest=target_lang)
-                current_text = result.text
-                # Use the pronunciation provided by the result if available.
-                pron = result.pronunciation if result.pronunciation else "N/A"
+                current_text, pron = await translate_cached(translator, current_text, target_lang, current_lang)
+                current_lang = target_lang
                 chain.append((i, target_lang, current_text, pron))
+                self.emit_sentences(current_text)
             except Exception as e:
                 chain.append((i, target_lang, f"Error: {e}", "N/A"))
+                failed = True
+            self.progress.emit(chain[-1])
+            if failed:
                 break
-            self.progress.emit(chain.copy())
-
-        # Compute similarity ratios between original text and each round's translated text.
-        similarities = []
-        for round_num, lang, text, _ in chain:
-            ratio = difflib.SequenceMatcher(None, self.original_text, text).ratio()
-            similarities.append(ratio)
-        max_sim = max(similarities)
-        min_sim = min(similarities)
-        # Map freq_value (0 means most similar, 100 means least similar).
-        desired = max_sim - (self.freq_value / 100) * (max_sim - min_sim)
-        # Find the round whose similarity is closest to desired.
-        best_index = min(range(len(similarities)), key=lambda i: abs(similarities[i] - desired))
+
+        # Remaining rounds use random languages and all translate the last fixed-round output,
+        # so they are independent and can be issued concurrently.
+        remaining = self.num_rounds - fixed_rounds
+        if remaining > 0 and not failed:
+            pivot_text = current_text
+            tail_langs = [_LANG_CODES[random.randrange(len(_LANG_CODES))] for _ in range(remaining)]
+            tail = [None] * remaining
+            sem = asyncio.Semaphore(_MAX_CONCURRENT_ROUNDS)
+
+            async def run_round(idx, lang):
+                round_num = fixed_rounds + idx + 1
+                try:
+                    async with sem:
+                        text, pron = await translate_cached(translator, pivot_text, lang, current_lang)
+                    tail[idx] = (round_num, lang, text, pron)
+                    self.emit_sentences(text)
+                except Exception as e:
+                    tail[idx] = (round_num, lang, f"Error: {e}", "N/A")
+                self.progress.emit(tail[idx])
+
+            await asyncio.gather(*(run_round(idx, lang) for idx, lang in enumerate(tail_langs)))
+            chain.extend(tail)
+
+        if self.freq_value == 0:
+            # Most similar is always round 0, the original text itself.
+            best_index = 0
+        else:
+            # Compute similarity ratios between original text and each round's translated text.
+            # rapidfuzz's ratio (normalized Indel distance) is close to difflib's Ratcliff/Obershelp ratio
+            # but not identical, so the chosen round can differ in edge cases; cdist scores the chain in
+            # one native call. Rounds that returned the original unchanged score 1.0 without it.
+            sims = np.ones(len(chain), dtype=np.float32)
+            changed = [idx for idx, (_, _, text, _) in enumerate(chain) if text != self.original_text]
+            if changed:
+                texts = [chain[idx][2] for idx in changed]
+                sims[changed] = process.cdist([self.original_text], texts, scorer=fuzz.ratio, dtype=np.float32)[0] * 0.01
+            if self.freq_value == 100:
+                # Most different: the least similar round, no distance scan needed.
+                best_index = int(sims.argmin())
+            else:
+                max_sim, min_sim = sims.max(), sims.min()
+                # Map freq_value (0 means most similar, 100 means least similar).
+                desired = max_sim - (self.freq_value * 0.01) * (max_sim - min_sim)
+                # Find the round whose similarity is closest to desired.
+                best_index = int(np.abs(sims - desired).argmin())
         final_output = chain[best_index][2]
         return chain, final_output
 
-# --- Worker for Text-to-Speech in a Separate Thread ---
-class SpeechWorker(QThread):
-    def __init__(self, text, parent=None):
+# --- Helper: Format one chain element as display lines ---
+def format_chain_entry(entry):
+    round_num, lang, text, pron = entry
+    lang_name = LANGUAGES.get(lang, "auto-detected") if lang != "auto" else "auto-detected"
+    return f"---({round_num})> [{lang} - {lang_name}]: {text}\n   Pronunciation: {pron}"
+
+# --- Text-to-Speech Service: one engine kept alive on its own thread ---
+class TtsService(QThread):
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.text = text
+        self.queue = queue.Queue()
+        self.engine = None
 
     def run(self):
-        engine = pyttsx3.init()
-        engine.say(self.text)
-        engine.runAndWait()
+        engine = self.engine = pyttsx3.init()
+        while True:
+            text = self.queue.get()
+            if text is None:  # Shutdown sentinel.
+                break
+            engine.say(text)
+            engine.runAndWait()
+
+    def speak(self, text):
+        self.queue.put(text)
+
+    def stop(self):
+        # Drop pending utterances so the sentinel is next, then cut off the one being spoken.
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.queue.put(None)
+        if self.engine is not None:
+            self.engine.stop()
+        self.wait(2000)  # Bounded: never hold up window close on the speech driver.
 
 # --- Main Application Window ---
 class MainWindow(QWidget):
+    # Final layer translation results, emitted from the background loop thread.
+    final_layer_done = pyqtSignal(str, str)  # (target_lang, retranslated_text)
+    final_layer_failed = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Dynamic Translation Chain")
-        self.history = []  # List to store previous runs.
-        self.language_slots = []  # List of tuples: (slot_number, language_code)
+        self.history = deque(maxlen=_HISTORY_SIZE)  # Previous runs; oldest dropped first.
+        self.run_count = 0  # Total runs, used to number history rows.
+        # Fixed language slots as parallel lists, kept sorted by slot number.
+        self.slot_nums = []   # Slot numbers (ascending)
+        self.slot_codes = []  # Language code for the slot at the same index
         self.final_output_text = ""
+        # Keeps the Translator's HTTP client and connections alive between runs.
+        self.loop_thread = AsyncLoopThread()
+        self.loop_thread.start()
+        # One Translator for the whole session so its HTTP client and connection pool are reused.
+        self.translator = create_translator(self.loop_thread.loop)
         self.setup_ui()
-        self.worker_thread = None
-        self.speech_thread = None
+        self.worker = None
+        self.tts = TtsService()
+        self.tts.start()
+        # Live progress is buffered and flushed to the display at ~30 Hz.
+        self.pending_progress = []
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(33)
+        self.progress_timer.timeout.connect(self.flush_progress)
+        self.final_layer_done.connect(self.apply_final_layer)
+        self.final_layer_failed.connect(self.show_final_layer_error)
 
     def setup_ui(self):
         # --- Overall Color & Style Setup via Stylesheet ---
@@ -219,6 +465,10 @@ class MainWindow(QWidget):
         freq_layout.addWidget(self.freq_slider)
         trans_layout.addLayout(freq_layout)
 
+        # Streaming speech: speak each round's sentences as soon as they are translated.
+        self.speak_rounds_checkbox = QCheckBox("Speak Rounds While Translating")
+        trans_layout.addWidget(self.speak_rounds_checkbox)
+
         # Run Translation Chain Button
         self.run_button = QPushButton("Run Translation Chain")
         self.run_button.clicked.connect(self.run_translation_chain)
@@ -284,6 +534,11 @@ class MainWindow(QWidget):
         main_layout.addWidget(self.tabs)
         self.setLayout(main_layout)
 
+    def closeEvent(self, event):
+        self.loop_thread.stop(self.translator)
+        self.tts.stop()
+        super().closeEvent(event)
+
     def toggle_final_layer(self, checked):
         self.final_layer_widget.setVisible(checked)
 
@@ -301,38 +556,35 @@ class MainWindow(QWidget):
             slot_num = None
         # If no slot number provided, assign next available.
         if slot_num is None:
-            slot_num = max([slot for slot, _ in self.language_slots], default=0) + 1
-        # Update if slot exists; otherwise, add new.
-        updated = False
-        for idx, (snum, _) in enumerate(self.language_slots):
-            if snum == slot_num:
-                self.language_slots[idx] = (slot_num, lang_code)
-                updated = True
-                break
-        if not updated:
-            self.language_slots.append((slot_num, lang_code))
-        self.language_slots.sort(key=lambda x: x[0])
+            slot_num = (self.slot_nums[-1] if self.slot_nums else 0) + 1
+        # Update if slot exists; otherwise, insert at its sorted position.
+        idx = bisect.bisect_left(self.slot_nums, slot_num)
+        if idx < len(self.slot_nums) and self.slot_nums[idx] == slot_num:
+            self.slot_codes[idx] = lang_code
+        else:
+            self.slot_nums.insert(idx, slot_num)
+            self.slot_codes.insert(idx, lang_code)
         self.refresh_chain_list()
         self.lang_code_input.clear()
         self.slot_input.clear()
 
     def edit_language_slot(self):
         selected = self.chain_list_widget.currentRow()
-        if selected >= 0 and selected < len(self.language_slots):
-            slot_num, lang_code = self.language_slots[selected]
-            self.lang_code_input.setText(lang_code)
-            self.slot_input.setText(str(slot_num))
+        if selected >= 0 and selected < len(self.slot_nums):
+            self.lang_code_input.setText(self.slot_codes[selected])
+            self.slot_input.setText(str(self.slot_nums[selected]))
             # Do not remove the slot; let add/update handle modifications.
 
     def remove_language_slot(self):
         selected = self.chain_list_widget.currentRow()
-        if selected >= 0 and selected < len(self.language_slots):
-            del self.language_slots[selected]
+        if selected >= 0 and selected < len(self.slot_nums):
+            del self.slot_nums[selected]
+            del self.slot_codes[selected]
             self.refresh_chain_list()
 
     def refresh_chain_list(self):
         self.chain_list_widget.clear()
-        for slot, code in self.language_slots:
+        for slot, code in zip(self.slot_nums, self.slot_codes):
             name = LANGUAGES.get(code, "Unknown")
             item = QListWidgetItem(f"Slot {slot}: {code} - {name}")
             self.chain_list_widget.addItem(item)
@@ -342,58 +594,59 @@ class MainWindow(QWidget):
         if not original_text:
             self.chain_display.setPlainText("Please enter input text.")
             return
-        sorted_chain = [code for _, code in sorted(self.language_slots, key=lambda x: x[0])]
+        sorted_chain = list(self.slot_codes)  # Already ordered by slot number.
         num_rounds = self.rounds_spin.value()
         freq_value = self.freq_slider.value()
 
         self.run_button.setEnabled(False)
-        self.chain_display.setPlainText("Processing translation chain...")
+        # Start empty: progress is append-only, so anything left here would stay in the transcript.
+        self.chain_display.clear()
 
-        self.worker_thread = QThread()
-        self.worker = TranslationWorker(original_text, sorted_chain, num_rounds, freq_value)
-        self.worker.moveToThread(self.worker_thread)
-        self.worker_thread.started.connect(self.worker.run)
+        speak_rounds = self.speak_rounds_checkbox.isChecked()
+        self.worker = TranslationWorker(original_text, sorted_chain, num_rounds, freq_value, self.translator, speak_rounds)
+        self.worker.sentence_ready.connect(self.tts.speak)
         self.worker.progress.connect(self.update_live_progress)
         self.worker.finished.connect(self.handle_worker_finished)
         self.worker.error.connect(self.handle_worker_error)
-        self.worker.finished.connect(lambda: self.worker_thread.quit())
         self.worker.finished.connect(self.worker.deleteLater)
-        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-        self.worker_thread.start()
+        self.pending_progress.clear()
+        self.progress_timer.start()
+        self.worker.start(self.loop_thread.loop)
+
+    def update_live_progress(self, entry):
+        # Buffer only the new element; the worker keeps the full chain.
+        self.pending_progress.append(format_chain_entry(entry))
+
+    def flush_progress(self):
+        # One append (and one relayout) for everything received since the last tick.
+        if self.pending_progress:
+            self.chain_display.append("\n".join(self.pending_progress))
+            self.pending_progress.clear()
 
-    def update_live_progress(self, chain):
-        lines = []
-        for round_num, lang, text, pron in chain:
-            lang_name = LANGUAGES.get(lang, "auto-detected") if lang != "auto" else "auto-detected"
-            lines.append(f"---({round_num})> [{lang} - {lang_name}]: {text}")
-            lines.append(f"   Pronunciation: {pron}")
-        self.chain_display.setPlainText("\n".join(lines))
+    def stop_progress(self):
+        self.progress_timer.stop()
+        self.flush_progress()
 
     def handle_worker_finished(self, chain, final_output):
-        lines = []
-        for round_num, lang, text, pron in chain:
-            lang_name = LANGUAGES.get(lang, "auto-detected") if lang != "auto" else "auto-detected"
-            lines.append(f"---({round_num})> [{lang} - {lang_name}]: {text}")
-            lines.append(f"   Pronunciation: {pron}")
-        chain_text = "\n".join(lines)
-        self.chain_display.setPlainText(chain_text)
+        self.stop_progress()
+        # The live progress appends already show every round; just mark the result.
+        self.chain_display.append(f"\n=== Final: {final_output} ===")
         self.final_output_label.setText(f"Final Output: {final_output}")
         self.final_output_text = final_output  # Save for TTS and final layer translation
         self.run_button.setEnabled(True)
         # Save to history.
         history_item = {"chain": chain, "final_output": final_output, "input": self.input_text.text()}
-        self.history.append(history_item)
-        self.refresh_history_list()
+        self.add_history_item(history_item)
 
     def handle_worker_error(self, error_msg):
+        self.stop_progress()
         self.chain_display.setPlainText(f"Error: {error_msg}")
         self.run_button.setEnabled(True)
 
     def speak_final_output(self):
-        # Use SpeechWorker to speak final_output_text in a separate thread.
+        # Queue final_output_text on the TTS service thread.
         if self.final_output_text:
-            self.speech_thread = SpeechWorker(self.final_output_text)
-            self.speech_thread.start()
+            self.tts.speak(self.final_output_text)
         else:
             self.chain_display.append("\nNo final output available to speak.")
 
@@ -408,15 +661,31 @@ class MainWindow(QWidget):
             self.final_layer_input.clear()
             self.final_layer_input.setPlaceholderText("Invalid target language! Try again.")
             return
+        # Translate on the background loop so the GUI thread never waits on the network.
+        self.final_layer_button.setEnabled(False)
+        future = asyncio.run_coroutine_threadsafe(
+            translate_cached(self.translator, self.final_output_text, target_lang), self.loop_thread.loop
+        )
+        future.add_done_callback(lambda fut: self._on_final_layer_done(fut, target_lang))
+
+    def _on_final_layer_done(self, future, target_lang):
+        # Runs on the loop thread; the signals are queued to the GUI thread.
         try:
-            translator = Translator()
-            result = translator.translate(self.final_output_text, dest=target_lang)
-            retranslated_text = result.text
-            # Update final output label to reflect re-translated final layer.
-            self.final_output_label.setText(f"Final Output (Re-Translated to {target_lang}): {retranslated_text}")
-            self.final_output_text = retranslated_text
+            retranslated_text, _ = future.result()
         except Exception as e:
-            QMessageBox.critical(self, "Translation Error", f"Error during final layer translation: {e}")
+            self.final_layer_failed.emit(str(e))
+            return
+        self.final_layer_done.emit(target_lang, retranslated_text)
+
+    def apply_final_layer(self, target_lang, retranslated_text):
+        # Update final output label to reflect re-translated final layer.
+        self.final_output_label.setText(f"Final Output (Re-Translated to {target_lang}): {retranslated_text}")
+        self.final_output_text = retranslated_text
+        self.final_layer_button.setEnabled(True)
+
+    def show_final_layer_error(self, error_msg):
+        QMessageBox.critical(self, "Translation Error", f"Error during final layer translation: {error_msg}")
+        self.final_layer_button.setEnabled(True)
 
     def export_chain(self):
         if not hasattr(self, "final_output_text") or not self.final_output_text:
@@ -427,8 +696,10 @@ class MainWindow(QWidget):
         if filename:
             try:
                 if fmt == "Plain Text":
+                    # Rebuild from the last run so the display's markers and messages stay out of the file.
+                    chain_text = "\n".join(format_chain_entry(entry) for entry in self.history[-1]["chain"])
                     with open(filename, "w", encoding="utf-8") as f:
-                        f.write(self.chain_display.toPlainText())
+                        f.write(chain_text)
                 elif fmt == "JSON":
                     chain_data = []
                     # Use the last history item.
@@ -445,28 +716,32 @@ class MainWindow(QWidget):
                         "final_output": self.history[-1]["final_output"],
                         "chain": chain_data
                     }
-                    with open(filename, "w", encoding="utf-8") as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
+                    if orjson is not None:
+                        # orjson emits UTF-8 bytes directly (non-ASCII is not escaped).
+                        with open(filename, "wb") as f:
+                            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                    else:
+                        with open(filename, "w", encoding="utf-8") as f:
+                            json.dump(data, f, ensure_ascii=False, indent=2)
                 self.chain_display.append(f"\nExported chain to {filename}")
             except Exception as e:
                 self.chain_display.append(f"\nError exporting file: {e}")
 
-    def refresh_history_list(self):
-        self.history_list.clear()
-        for idx, item in enumerate(self.history, start=1):
-            summary = f"Run {idx}: Input='{item['input'][:15]}...', Final='{item['final_output'][:15]}...'"
-            list_item = QListWidgetItem(summary)
-            self.history_list.addItem(list_item)
+    def add_history_item(self, item):
+        # Append one row; when the deque is full its oldest run (row 0) is dropped too.
+        if len(self.history) == self.history.maxlen:
+            self.history_list.takeItem(0)
+        self.history.append(item)
+        self.run_count += 1
+        summary = f"Run {self.run_count}: Input='{item['input'][:15]}...', Final='{item['final_output'][:15]}...'"
+        self.history_list.addItem(QListWidgetItem(summary))
 
     def load_history_item(self, item):
         idx = self.history_list.row(item)
         if idx < len(self.history):
             history_item = self.history[idx]
             lines = [f"Input: {history_item['input']}"]
-            for round_num, lang, text, pron in history_item["chain"]:
-                lang_name = LANGUAGES.get(lang, "auto-detected") if lang != "auto" else "auto-detected"
-                lines.append(f"---({round_num})> [{lang} - {lang_name}]: {text}")
-                lines.append(f"   Pronunciation: {pron}")
+            lines.extend(format_chain_entry(entry) for entry in history_item["chain"])
             lines.append(f"Final Output: {history_item['final_output']}")
             self.history_details.setPlainText("\n".join(lines))
 
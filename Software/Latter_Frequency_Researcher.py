@@ -1,7 +1,11 @@
 import sys
 import os
 import string
-from collections import defaultdict
+import multiprocessing
+from collections import Counter
+import heapq
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QTextEdit, QSpinBox,
@@ -11,13 +15,239 @@ from PyQt6.QtCore import QSize
 from PyQt6.QtGui import QAction
 from docx import Document
 import fitz  # PyMuPDF
+import matplotlib
+matplotlib.use('Agg')  # Graphs are only ever saved as PNG files; no GUI backend needed
 import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    # Optional: JIT-compiled counting kernel
+    from numba import njit, types
+    from numba.typed import Dict
+except ImportError:
+    njit = None
+import mmap
+import tempfile
 import webbrowser
 
 # Attempt to use the desired style, with a fallback
 plt.style.use('seaborn-darkgrid' if 'seaborn-darkgrid' in plt.style.available else 'ggplot')
+plt.rcParams.update({
+    'text.usetex': False,
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+})
+
+# PDFs shorter than this are read sequentially; worker start-up would outweigh the gain.
+PARALLEL_PDF_MIN_PAGES = 8
+
+# 256-byte table for bytes.translate: lowercases ASCII letters, leaves every other byte alone
+ASCII_LOWER_TABLE = bytes.maketrans(string.ascii_uppercase.encode("ascii"),
+                                    string.ascii_lowercase.encode("ascii"))
+
+# Page template for the combined A-Z report, filled with str.format
+AZ_REPORT_TEMPLATE = """
+<html>
+    <head>
+        <title>Precision Analysis: A-Z</title>
+        <style>
+            body {{ 
+                font-family: 'Segoe UI', sans-serif;
+                margin: 30px;
+                background-color: #f8f9fa;
+            }}
+            .container {{ 
+                max-width: 1400px;
+                margin: 0 auto;
+                padding: 30px;
+                background-color: white;
+                box-shadow: 0 0 20px rgba(0,0,0,0.1);
+                border-radius: 10px;
+            }}
+            h1 {{ 
+                color: #2c3e50;
+                border-bottom: 2px solid #4c72b0;
+                padding-bottom: 10px;
+            }}
+            img {{ 
+                width: 100%;
+                height: auto;
+                margin: 20px 0;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>Precision Analysis: A-Z (n={n})</h1>
+            {html_content}
+        </div>
+    </body>
+</html>
+"""
+
+
+# Extraction workers are spawned rather than forked, since the GUI process has threads. Spawning
+# is slow, so one pool is started on first use and kept for the rest of the session.
+_MP_CONTEXT = multiprocessing.get_context('spawn')
+EXTRACT_WORKERS = min(os.cpu_count() or 1, 8)
+_extraction_pool = None
+
+def extraction_executor():
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=_MP_CONTEXT)
+    return _extraction_pool
+
+def reset_extraction_executor():
+    # A worker died; start a fresh pool next time
+    global _extraction_pool
+    _extraction_pool = None
+
+def extract_pdf_pages(path, start, stop):
+    # Text of pages [start, stop). Each worker opens its own document: MuPDF is not thread-safe.
+    with fitz.open(path) as doc:
+        return "".join(doc.load_page(i).get_text() for i in range(start, stop))
+
+def extract_pdf_text(path):
+    with fitz.open(path) as doc:
+        page_count = doc.page_count
+        if page_count < PARALLEL_PDF_MIN_PAGES:
+            return "".join(page.get_text() for page in doc)
+    # Split the pages into one contiguous range per worker process
+    step = -(-page_count // EXTRACT_WORKERS)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    try:
+        return "".join(extraction_executor().map(extract_pdf_pages, [path] * len(starts), starts, stops))
+    except BrokenProcessPool:
+        reset_extraction_executor()
+        raise
+
+def read_text_file(path):
+    # Decodes straight from a memory map, skipping the intermediate bytes copy of f.read().
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, 'utf-8')
+            has_cr = mm.find(b'\r') != -1
+    if has_cr:
+        # Same newline handling as text mode
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def extract_text(path, parallel_pages=True):
+    # Module level so it can be sent to worker processes.
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".txt":
+        return read_text_file(path)
+    elif ext == ".docx":
+        doc = Document(path)
+        return "\n".join(p.text for p in doc.paragraphs)
+    elif ext == ".pdf":
+        if not parallel_pages:
+            with fitz.open(path) as doc:
+                return "".join(page.get_text() for page in doc)
+        return extract_pdf_text(path)
+    raise ValueError("Unsupported file format")
+
+def build_valid_lut(valid_chars):
+    # 256-entry byte lookup: True for bytes that may appear in a sequence.
+    lut = np.zeros(256, dtype=bool)
+    lut[np.frombuffer(valid_chars.encode("ascii"), dtype=np.uint8)] = True
+    return lut
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_packed(codes, lead_lut, n, valid_lut):
+        # Packs each accepted lead byte and its n followers into one uint64 key (n <= 7).
+        counts = Dict.empty(key_type=types.uint64, value_type=types.int64)
+        shift = np.uint64(8)
+        for i in range(codes.size - n):
+            lead = codes[i]
+            if not lead_lut[lead]:
+                continue
+            key = np.uint64(lead)
+            ok = True
+            for k in range(1, n + 1):
+                c = codes[i + k]
+                if not valid_lut[c]:
+                    ok = False
+                    break
+                key = (key << shift) | np.uint64(c)
+            if ok:
+                counts[key] = counts.get(key, 0) + 1
+        # Hand back plain arrays; iterating a typed Dict from Python is slow.
+        keys = np.empty(len(counts), dtype=np.uint64)
+        values = np.empty(len(counts), dtype=np.int64)
+        j = 0
+        for key, count in counts.items():
+            keys[j] = key
+            values[j] = count
+            j += 1
+        return keys, values
+
+def _count_by_lead_jit(codes, leads, n, valid_lut):
+    result = {lead: {} for lead in leads}
+    keys, counts = _count_packed(codes, build_valid_lut(leads), n, valid_lut)
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        key = key.to_bytes(n + 1, "big").decode("ascii")
+        result[key[0]][key[1:]] = count
+    return result
+
+def warm_up_kernel():
+    # Compile (or load from cache) the Numba kernel before the first real analysis.
+    if njit is not None:
+        dummy = np.frombuffer((string.ascii_lowercase * 40).encode("ascii"), dtype=np.uint8)
+        _count_by_lead_jit(dummy, "a", 1, build_valid_lut(string.ascii_lowercase))
+
+def count_sequences(codes, target, n, valid_lut):
+    # Counts the n-byte sequences following each occurrence of the ASCII byte target in codes.
+    # Valid characters are all ASCII, so any window touching a multi-byte UTF-8 character is rejected.
+    if njit is not None:
+        return _count_by_lead_jit(codes, chr(target), n, valid_lut)[chr(target)]
+    if codes.size <= n:
+        return {}
+    starts = np.flatnonzero(codes[:-n] == target)
+    windows = sliding_window_view(codes[1:], n)[starts]
+    windows = windows[valid_lut[windows].all(axis=1)]
+    keys, counts = np.unique(windows.view(f"S{n}").ravel(), return_counts=True)
+    return {key.decode("ascii"): count for key, count in zip(keys.tolist(), counts.tolist())}
+
+def count_sequences_by_lead(codes, leads, n, valid_lut):
+    # Single pass for many targets: {lead: {sequence: count}} for every ASCII character in leads.
+    if njit is not None:
+        return _count_by_lead_jit(codes, leads, n, valid_lut)
+    result = {lead: {} for lead in leads}
+    if codes.size <= n:
+        return result
+    lead_lut = build_valid_lut(leads)
+    windows = sliding_window_view(codes, n + 1)
+    windows = windows[lead_lut[windows[:, 0]]]
+    windows = windows[valid_lut[windows[:, 1:]].all(axis=1)]
+    # Keys sort by their lead byte first, so each target's sequences come out grouped.
+    keys, counts = np.unique(windows.view(f"S{n + 1}").ravel(), return_counts=True)
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        key = key.decode("ascii")
+        result[key[0]][key[1:]] = count
+    return result
+
+def find_all(text, target, stop):
+    # Yields every index of target in text[:stop]; str.find skips the indices in between.
+    i = text.find(target, 0, stop) if stop > 0 else -1
+    while i != -1:
+        yield i
+        i = text.find(target, i + 1, stop)
+
+def count_sequences_text(text, target, n, valid_chars):
+    # Pure-Python scan, used for non-ASCII targets that the byte scan cannot match.
+    valid_set = frozenset(valid_chars)
+    # Last index with n characters after it, plus one
+    seqs = (text[i+1:i+1+n] for i in find_all(text, target, len(text) - n))
+    # Keep only valid sequences (letters, numbers, or symbols); Counter tallies them in C
+    return Counter(seq for seq in seqs if valid_set.issuperset(seq))
 
 class PrecisionTextAnalyzer(QMainWindow):
     def __init__(self):
@@ -25,9 +255,12 @@ class PrecisionTextAnalyzer(QMainWindow):
         self.setWindowTitle("Precision Text Analyzer")
         self.setGeometry(100, 100, 800, 600)
         self.loaded_text = ""
+        self.loaded_bytes = b""  # UTF-8 encoding of loaded_text, ASCII letters lowercased
+        self.loaded_codes = np.zeros(0, dtype=np.uint8)  # Same bytes as a uint8 array
         self.current_analysis = {}
         self.ignore_characters = ""
         self.init_ui()
+        warm_up_kernel()
 
     def init_ui(self):
         main_widget = QWidget()
@@ -62,6 +295,9 @@ class PrecisionTextAnalyzer(QMainWindow):
         self.ignore_input = QLineEdit()
         self.ignore_input.setPlaceholderText("Characters to ignore (e.g., !@#)")
         self.ignore_input.setFixedWidth(250)
+        # Drop ignored characters from the text before scanning instead of letting them end a sequence
+        self.skip_ignored_check = QCheckBox("Skip Ignored")
+        self.skip_ignored_check.setChecked(False)
 
         self.analyze_btn = QPushButton("Analyze")
         self.analyze_btn.clicked.connect(self.analyze_text)
@@ -78,6 +314,7 @@ class PrecisionTextAnalyzer(QMainWindow):
         control_layout.addWidget(self.symbol_check)
         control_layout.addWidget(QLabel("Ignore:"))
         control_layout.addWidget(self.ignore_input)
+        control_layout.addWidget(self.skip_ignored_check)
         control_layout.addWidget(self.analyze_btn)
         control_layout.addWidget(self.analyze_a_z_btn)
         control_layout.addStretch()
@@ -114,29 +351,38 @@ class PrecisionTextAnalyzer(QMainWindow):
         if not file_paths:
             return
 
-        combined_text = ""
-        for path in file_paths:
+        texts = [None] * len(file_paths)
+        errors = []
+        if len(file_paths) == 1:
+            # A single file keeps page-level parallelism for large PDFs
             try:
-                combined_text += self.extract_text(path) + "\n"
+                texts[0] = extract_text(file_paths[0])
             except Exception as e:
-                self.show_error(f"Error reading {os.path.basename(path)}:\n{str(e)}")
-        
-        self.loaded_text = combined_text.lower()
+                errors.append((file_paths[0], e))
+        else:
+            # One file per worker process; pages are read sequentially inside each worker
+            executor = extraction_executor()
+            futures = {executor.submit(extract_text, path, False): idx for idx, path in enumerate(file_paths)}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    texts[idx] = future.result()
+                except BrokenProcessPool as e:
+                    reset_extraction_executor()
+                    errors.append((file_paths[idx], e))
+                except Exception as e:
+                    errors.append((file_paths[idx], e))
+        for path, e in errors:
+            self.show_error(f"Error reading {os.path.basename(path)}:\n{str(e)}")
+
+        # Same layout as before: each file's text followed by a newline
+        combined_text = "\n".join([text for text in texts if text is not None] + [""])
+        # The text keeps its case; the byte scans lowercase through a translate table instead
+        self.loaded_text = combined_text
+        self.loaded_bytes = combined_text.encode("utf-8").translate(ASCII_LOWER_TABLE)
+        self.loaded_codes = np.frombuffer(self.loaded_bytes, dtype=np.uint8)
         self.results_display.setPlainText(f"Loaded {len(file_paths)} files\nTotal characters: {len(combined_text):,}")
 
-    def extract_text(self, path):
-        ext = os.path.splitext(path)[1].lower()
-        if ext == ".txt":
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
-        elif ext == ".docx":
-            doc = Document(path)
-            return "\n".join(p.text for p in doc.paragraphs)
-        elif ext == ".pdf":
-            doc = fitz.open(path)
-            return "".join(page.get_text() for page in doc)
-        raise ValueError("Unsupported file format")
-
     def analyze_text(self):
         target = self.input_field.text().strip()
         n = self.n_spin.value()
@@ -149,19 +395,17 @@ class PrecisionTextAnalyzer(QMainWindow):
         if len(target) != 1:
             self.show_error("Please enter exactly one target character")
             return
+        # Matching is case-insensitive (a few characters lowercase to more than one)
+        if len(target.lower()) == 1:
+            target = target.lower()
 
-        sequences = defaultdict(int)
-        total = 0
         valid_chars = self.get_valid_characters()
-        
-        # Iterate through the loaded text
-        for i in range(len(self.loaded_text) - n):
-            if self.loaded_text[i] == target:
-                seq = self.loaded_text[i+1:i+1+n]
-                # Check if the sequence is valid (letters, numbers, or symbols)
-                if len(seq) == n and all(char in valid_chars for char in seq):
-                    sequences[seq] += 1
-                    total += 1
+        if ord(target) < 128:
+            # Vectorized scan over the UTF-8 bytes of the loaded text
+            sequences = count_sequences(self._scan_codes(), ord(target), n, build_valid_lut(valid_chars))
+        else:
+            sequences = count_sequences_text(self._scan_text(), target, n, valid_chars)
+        total = sum(sequences.values())
 
         if not sequences:
             self.show_info("No matching sequences found")
@@ -184,104 +428,108 @@ class PrecisionTextAnalyzer(QMainWindow):
         n = self.n_spin.value()
         self.ignore_characters = self.ignore_input.text().strip()
 
+        # Letters only: the loaded text is lowercase, so the uppercase half of the set can never match.
+        # Same results either way (the LUT scan cost doesn't depend on the set size); this just keeps
+        # the set minimal. With digits or symbols enabled, the checkboxes decide as before.
+        if (self.letter_check.isChecked() and not self.number_check.isChecked()
+                and not self.symbol_check.isChecked()):
+            valid_chars = self.get_valid_characters(valid_override=string.ascii_lowercase)
+        else:
+            valid_chars = self.get_valid_characters()
+
+        # Count every letter's follower sequences in one scan, then render each letter
+        valid_lut = build_valid_lut(valid_chars)
+        all_sequences = self._scan_all_targets(n, valid_lut)
+
+        # One figure is reused for every letter; only the axes are redrawn
+        fig, ax = plt.subplots(figsize=(10, 6), dpi=80, constrained_layout=True)
+        # Graphs are written next to the report as PNG files instead of inlined as base64
+        outdir = tempfile.mkdtemp(prefix="precision_az_")
+
         # Collect all HTML content for each letter
-        html_content = ""
+        parts = []
         for target in string.ascii_lowercase:
-            self.input_field.setText(target)
-            self.analyze_text()
-            html_content += self._generate_single_letter_html()
-
-        # Save the combined HTML content to a single file
-        combined_html = f"""
-        <html>
-            <head>
-                <title>Precision Analysis: A-Z</title>
-                <style>
-                    body {{ 
-                        font-family: 'Segoe UI', sans-serif;
-                        margin: 30px;
-                        background-color: #f8f9fa;
-                    }}
-                    .container {{ 
-                        max-width: 1400px;
-                        margin: 0 auto;
-                        padding: 30px;
-                        background-color: white;
-                        box-shadow: 0 0 20px rgba(0,0,0,0.1);
-                        border-radius: 10px;
-                    }}
-                    h1 {{ 
-                        color: #2c3e50;
-                        border-bottom: 2px solid #4c72b0;
-                        padding-bottom: 10px;
-                    }}
-                    img {{ 
-                        width: 100%;
-                        height: auto;
-                        margin: 20px 0;
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <h1>Precision Analysis: A-Z (n={n})</h1>
-                    {html_content}
-                </div>
-            </body>
-        </html>
-        """
+            sequences = all_sequences[target]
+            self.current_analysis = {
+                'target': target,
+                'n': n,
+                'sequences': sequences,
+                'total': sum(sequences.values())
+            }
+            parts.append(self._generate_single_letter_html(fig, ax, outdir))
+        plt.close(fig)  # Close the figure to free memory
+        html_content = "".join(parts)
 
         # Save the combined HTML file
-        temp_file = "precision_analysis_a_z.html"
-        with open(temp_file, "w") as f:
-            f.write(combined_html)
+        temp_file = os.path.join(outdir, "index.html")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(AZ_REPORT_TEMPLATE.format(n=n, html_content=html_content))
         webbrowser.open(f"file://{os.path.abspath(temp_file)}")
 
-    def _generate_single_letter_html(self):
-        img_data = self._generate_single_letter_graph()  # Get the image data
-        img_base64 = base64.b64encode(img_data).decode('utf-8')  # Encode to base64
+    def _scan_all_targets(self, n, valid_lut):
+        return count_sequences_by_lead(self._scan_codes(), string.ascii_lowercase, n, valid_lut)
+
+    def _skip_ignored(self):
+        return self.skip_ignored_check.isChecked() and bool(self.ignore_characters)
+
+    def _scan_text(self):
+        # Lowercased loaded text, minus the ignored characters when Skip Ignored is on.
+        # Only the non-ASCII fallback needs it, so the full lower() pass is paid here, not at load.
+        text = self.loaded_text.lower()
+        if not self._skip_ignored():
+            return text
+        return text.translate(str.maketrans('', '', self.ignore_characters))
+
+    def _scan_codes(self):
+        # Byte buffer for the vectorized scans, minus the ignored characters when Skip Ignored is on
+        if not self._skip_ignored():
+            return self.loaded_codes
+        if all(ord(c) < 128 for c in self.ignore_characters):
+            # bytes.translate deletes single bytes in C without decoding the text
+            scrubbed = self.loaded_bytes.translate(None, self.ignore_characters.encode("ascii"))
+        else:
+            # Multi-byte characters cannot be deleted byte by byte
+            scrubbed = self._scan_text().encode("utf-8")
+        return np.frombuffer(scrubbed, dtype=np.uint8)
+
+    def _generate_single_letter_html(self, fig, ax, outdir):
+        target = self.current_analysis['target']
+        self._generate_single_letter_graph(fig, ax, os.path.join(outdir, f"{target}.png"))
 
         return f"""
-        <h2>Target: '{self.current_analysis['target']}'</h2>
-        <img src="data:image/png;base64,{img_base64}">
+        <h2>Target: '{target}'</h2>
+        <img src="{target}.png">
         """
 
-    def _generate_single_letter_graph(self):
-        fig = plt.figure(figsize=(10, 6), dpi=100)
-        visible_categories = [('letters', string.ascii_letters)]
-
-        gs = fig.add_gridspec(len(visible_categories), 1)
-        
-        for idx, (category_name, category_chars) in enumerate(visible_categories):
-            ax = fig.add_subplot(gs[idx])
-            data = self._prepare_category_data(category_chars)
-            self._plot_category(ax, data, category_name.capitalize(), 
-                              '#4c72b0')
-
-        plt.tight_layout()
-        
-        # Save the figure to a BytesIO buffer instead of showing it
-        buf = BytesIO()
-        fig.savefig(buf, format='png', bbox_inches='tight')
-        plt.close(fig)  # Close the figure to free memory
-        buf.seek(0)  # Rewind the buffer to the beginning
-        return buf.getvalue()  # Return the image data
-
-    def get_valid_characters(self):
-        valid_chars = ""
-        if self.letter_check.isChecked():
-            valid_chars += string.ascii_letters  # Only letters for A-Z analysis
-        if self.number_check.isChecked():
-            valid_chars += string.digits
-        if self.symbol_check.isChecked():
-            valid_chars += string.punctuation
+    def _generate_single_letter_graph(self, fig, ax, path):
+        # Clear the previous letter's artists instead of building a new figure
+        ax.clear()
+        data = self._prepare_category_data(string.ascii_letters)
+        self._plot_category(ax, data, 'Letters', '#4c72b0')
+
+        # Save the figure to disk instead of showing it
+        fig.savefig(path, format='png', bbox_inches='tight')
+
+    def get_valid_characters(self, valid_override=None):
+        if valid_override is not None:
+            # Caller picks the categories itself; the checkboxes are left untouched
+            valid_chars = valid_override
+        else:
+            valid_chars = ""
+            if self.letter_check.isChecked():
+                valid_chars += string.ascii_letters  # Only letters for A-Z analysis
+            if self.number_check.isChecked():
+                valid_chars += string.digits
+            if self.symbol_check.isChecked():
+                valid_chars += string.punctuation
         
         # Remove ignored characters
         return ''.join(c for c in valid_chars if c not in self.ignore_characters)
 
     def display_results(self):
-        sorted_seqs = sorted(self.current_analysis['sequences'].items(), 
-                           key=lambda x: (-x[1], x[0]))
+        # Partial heap for the top 50; same (count desc, sequence asc) order as a full sort
+        top_seqs = heapq.nsmallest(50, self.current_analysis['sequences'].items(),
+                                   key=lambda x: (-x[1], x[0]))
         
         result_text = (
             f"Precision Analysis Report\n"
@@ -291,21 +539,21 @@ class PrecisionTextAnalyzer(QMainWindow):
             "Top Sequences:\n"
         )
         
-        for seq, count in sorted_seqs[:50]:
+        for seq, count in top_seqs:
             percentage = (count / self.current_analysis['total']) * 100
             result_text += f"▸ {seq}: {count:,} ({percentage:.2f}%)\n"
         
         self.results_display.setPlainText(result_text)
 
     def _prepare_category_data(self, category_chars):
-        freq = defaultdict(int)
-        total = 0
+        freq = Counter()
+        category_set = frozenset(category_chars)
         
         for seq, count in self.current_analysis['sequences'].items():
             for char in seq:
-                if char in category_chars:
+                if char in category_set:
                     freq[char] += count
-                    total += count
+        total = sum(freq.values())
         
         sorted_items = sorted(freq.items(), key=lambda x: (-x[1], x[0]))
         return {
@@ -1,5 +1,12 @@
 import sys
+import os
+import bisect
+import heapq
+import math
+import pickle
 import threading
+from importlib.metadata import version
+from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QLineEdit, QPushButton,
     QListWidget, QLabel, QSlider, QHBoxLayout, QProgressBar, QSizePolicy,
@@ -9,69 +16,148 @@ from PyQt6.QtCore import Qt, pyqtSignal, QObject, QThread
 from PyQt6.QtGui import QColor, QFont
 import nltk
 from nltk.corpus import cmudict
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
 from wordfreq import zipf_frequency
 from collections import defaultdict
-nltk.download('cmudict', quiet=True)
+
+# The phoneme map only depends on the CMU dict, so it is built once and pickled here.
+CACHE_VERSION = 5  # Bump whenever the cached payload changes shape.
+CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "homoform" / "phoneme_map.pkl"
+
+def cmudict_stamp():
+    # Identifies the installed CMU dict file and wordfreq release (it fills the cached frequency table),
+    # so a cache built from another copy of either is ignored.
+    pointer = cmudict.abspath("cmudict")
+    path = getattr(pointer, "path", None) or pointer.zipfile.filename
+    stat = os.stat(path)
+    return (CACHE_VERSION, str(pointer), stat.st_mtime_ns, stat.st_size, version("wordfreq"))
+
+def load_cached_map(stamp):
+    try:
+        payload = pickle.loads(CACHE_PATH.read_bytes())
+    except Exception:
+        return None  # Missing or unreadable cache: rebuild.
+    if payload.get("stamp") != stamp:
+        return None
+    return payload["index"]
+
+def save_cached_map(stamp, index):
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_PATH.with_suffix(".tmp")
+        tmp_path.write_bytes(pickle.dumps({"stamp": stamp, "index": index}, protocol=5))
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass  # The cache is only an optimisation.
 
 class PhonemeMapBuilder(QObject):
     progress = pyqtSignal(int)
     finished = pyqtSignal(dict)
     
     def run(self):
-        cmu_dict = cmudict.dict()
-        phoneme_map = defaultdict(list)
-        total = len(cmu_dict)
-        for i, (word, prons) in enumerate(cmu_dict.items()):
-            self.progress.emit(int((i/total)*100))
-            for pron in prons:
-                clean = tuple(p[:-1] if p[-1].isdigit() else p for p in pron)
-                phoneme_map[clean].append(word.lower())
-        self.finished.emit(phoneme_map)
+        # Fetch the CMU dict here on the worker thread, and only when it is missing,
+        # so the window paints without waiting on NLTK's download check.
+        try:
+            stamp = cmudict_stamp()
+        except LookupError:
+            nltk.download('cmudict', quiet=True)
+            stamp = cmudict_stamp()
+        index = load_cached_map(stamp)
+        if index is None:
+            cmu_dict = cmudict.dict()
+            phoneme_map = defaultdict(list)
+            pronunciations = {}
+            total = len(cmu_dict)
+            for i, (word, prons) in enumerate(cmu_dict.items()):
+                self.progress.emit(int((i/total)*100))
+                cleaned = []
+                for pron in prons:
+                    clean = tuple(p[:-1] if p[-1].isdigit() else p for p in pron)
+                    phoneme_map[clean].append(word.lower())
+                    cleaned.append(clean)
+                pronunciations[word] = cleaned
+            # Phoneme strings sorted by length, so a length range is one contiguous slice.
+            key_seqs = sorted(phoneme_map, key=lambda seq: len(' '.join(seq)))
+            key_strings = [' '.join(seq) for seq in key_seqs]
+            index = {
+                "phoneme_map": dict(phoneme_map),
+                # Stress-free pronunciations per word, so searches never reload the CMU dict.
+                "pronunciations": pronunciations,
+                "key_seqs": key_seqs,
+                "key_strings": key_strings,
+                "key_lengths": [len(key) for key in key_strings],
+                # Zipf frequency of every dictionary word, looked up instead of recomputed per search.
+                "freq_table": {word: zipf_frequency(word, 'en') for word in set(cmu_dict)},
+            }
+            save_cached_map(stamp, index)
+        self.progress.emit(100)
+        self.finished.emit(index)
+
+def length_bounds(length, accuracy):
+    # Lengths a string may have and still reach accuracy against one of the given length.
+    # ratio = 2*matches/(len_a+len_b) <= 2*min/(len_a+len_b); the 0.5 matches the score cutoff.
+    a = accuracy - 0.5
+    if a <= 0:
+        return 0, math.inf
+    return math.floor(length * a / (200 - a)), math.ceil(length * (200 - a) / a)
 
 class HomophoneWorker(QObject):
     finished = pyqtSignal(list)
     
-    def __init__(self, word, phoneme_map, accuracy=90, min_zipf=2.0, max_results=10, use_freq_filter=True):
+    def __init__(self, word, phoneme_index, accuracy=90, min_zipf=2.0, max_results=10, use_freq_filter=True):
         super().__init__()
         self.word = word.lower()
-        self.phoneme_map = phoneme_map
+        self.phoneme_map = phoneme_index["phoneme_map"]
+        self.pronunciations = phoneme_index["pronunciations"]
+        self.key_seqs = phoneme_index["key_seqs"]
+        self.key_strings = phoneme_index["key_strings"]
+        self.key_lengths = phoneme_index["key_lengths"]
+        self.freq_table = phoneme_index["freq_table"]
         self.accuracy = accuracy
         self.min_zipf = min_zipf
         self.max_results = max_results
         self.use_freq_filter = use_freq_filter
         
     def process(self):
-        cmu_dict = cmudict.dict()
-        target_prons = cmu_dict.get(self.word, [])
-        if not target_prons:
+        target_sequences = self.pronunciations.get(self.word, [])
+        if not target_sequences:
             self.finished.emit([])
             return
-        target_sequences = []
-        for pron in target_prons:
-            clean = tuple(p[:-1] if p[-1].isdigit() else p for p in pron)
-            target_sequences.append(clean)
             
         candidates = set()
-        for seq in target_sequences:
-            for candidate_seq in self.phoneme_map:
-                score = fuzz.ratio(' '.join(seq), ' '.join(candidate_seq))
-                if score >= self.accuracy:
-                    candidates.update(self.phoneme_map[candidate_seq])
+        queries = [' '.join(seq) for seq in target_sequences]
+        # Only strings of a compatible length can score high enough; skip the rest unscored.
+        bounds = [length_bounds(len(query), self.accuracy) for query in queries]
+        start = bisect.bisect_left(self.key_lengths, min(low for low, _ in bounds))
+        stop = bisect.bisect_right(self.key_lengths, max(high for _, high in bounds))
+        # fuzzywuzzy rounded scores to whole points, so accept anything that would round up.
+        cutoff = self.accuracy - 0.5
+        choices = self.key_strings[start:stop]
+        for query in queries:
+            # Native scan that returns only the hits, as (string, score, index into choices).
+            hits = process.extract(query, choices, scorer=fuzz.ratio,
+                                   score_cutoff=cutoff, limit=None)
+            for _, _, idx in hits:
+                candidates.update(self.phoneme_map[self.key_seqs[start + idx]])
         
         valid = []
         for word in candidates:
             if word == self.word:
                 continue
             if self.use_freq_filter:
-                if zipf_frequency(word, 'en') >= self.min_zipf:
+                if self.freq_table.get(word, 0.0) >= self.min_zipf:
                     valid.append(word)
             else:
                 valid.append(word)
         
         unique = list(set(valid))
-        sorted_words = sorted(unique, key=lambda w: (-zipf_frequency(w, 'en'), w))
-        limited = sorted_words[:self.max_results] if self.max_results > 0 else sorted_words
+        freq_table = self.freq_table
+        rank = lambda w: (-freq_table.get(w, 0.0), w)
+        if 0 < self.max_results < len(unique):
+            # Partial heap: only the top max_results words are ever ordered
+            limited = heapq.nsmallest(self.max_results, unique, key=rank)
+        else:
+            limited = sorted(unique, key=rank)
         self.finished.emit(limited)
 
 class MainWindow(QMainWindow):
@@ -91,7 +177,7 @@ class MainWindow(QMainWindow):
             QListWidget { border: 1px solid #ddd; border-radius: 4px; }
         """)
         
-        self.phoneme_map = None
+        self.phoneme_index = None
         self.is_ready = False
         
         self.central_widget = QWidget()
@@ -227,8 +313,8 @@ class MainWindow(QMainWindow):
         self.builder_thread.started.connect(self.builder.run)
         self.builder_thread.start()
 
-    def on_phoneme_ready(self, phoneme_map):
-        self.phoneme_map = phoneme_map
+    def on_phoneme_ready(self, phoneme_index):
+        self.phoneme_index = phoneme_index
         self.is_ready = True
         self.builder_thread.quit()
         self.progress.hide()
@@ -274,7 +360,7 @@ class MainWindow(QMainWindow):
         self.thread = QThread()
         self.worker = HomophoneWorker(
             word=word,
-            phoneme_map=self.phoneme_map,
+            phoneme_index=self.phoneme_index,
             accuracy=accuracy,
             min_zipf=min_zipf,
             max_results=max_results,
@@ -2,107 +2,486 @@
 import sys
 import os
 import re
-from collections import defaultdict
+import io
+import itertools
+import multiprocessing
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from operator import methodcaller
+import numpy as np
 import PyPDF2
 import docx
-from langdetect import detect, DetectorFactory
+from langdetect import detect, DetectorFactory, detector_factory
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
-    QLabel, QFileDialog, QMessageBox, QTextEdit, QProgressBar
+    QLabel, QFileDialog, QMessageBox, QTextEdit, QProgressBar, QLineEdit
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 
+try:
+    # Optional: MuPDF extracts PDF text far faster than pure-Python PyPDF2
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    # Optional: JIT-compiled character classifier
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    # Optional: Aho-Corasick automaton that finds every keyword in one pass over the text
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Optional: RE2 scans with a DFA in C instead of the backtracking engine
+    import re2
+except ImportError:
+    re2 = None
+
 DetectorFactory.seed = 0
 
+# langdetect scores every loaded profile on each detect(); only the common languages are loaded.
+_LANG_PROFILES = ('en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko',
+                  'zh-cn', 'zh-tw', 'ar', 'hi', 'bn', 'id')
+
+def init_language_profiles(codes):
+    profiles = []
+    for code in codes:
+        path = os.path.join(detector_factory.PROFILES_DIRECTORY, code)
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8') as f:
+                profiles.append(f.read())
+    if len(profiles) < 2:
+        return  # langdetect needs two profiles; leave its lazy full load in place
+    factory = DetectorFactory()
+    factory.load_json_profile(profiles)
+    # detect() builds its detector from this module global and only loads all profiles when it is None
+    detector_factory._factory = factory
+
+init_language_profiles(_LANG_PROFILES)
+
+# Compiled once at import instead of on every analysis
+_WORD_RE = re.compile(r"\b\w[\w'-]*\b", re.UNICODE)
+_LAST_SPACE_RE = re.compile(r'\s\S*\Z')  # Last whitespace character and the text after it
+_SENT_RE = re.compile(r'[.!?]+')
+_SUPPORTED_EXTS = frozenset({'.pdf', '.docx', '.txt'})
+_LANG_SAMPLE_CHARS = 2000  # Size of each slice handed to langdetect
+_PARALLEL_PDF_MIN_PAGES = 4  # Smaller PDFs are read on the worker thread alone
+_CHUNK_CHARS = 4 * 1024 * 1024  # Text is analyzed in pieces of about this size
+if re2 is not None:
+    # RE2's \w and \b are ASCII-only, so its word pattern is only used on ASCII text
+    _WORD_RE2 = re2.compile(r"\b\w[\w'-]*\b")
+else:
+    _WORD_RE2 = None
+
+# Character class ids. OTHER is alphanumeric without being a letter or digit (e.g. '½') and is not reported.
+_LETTER, _DIGIT, _SPACE, _SPECIAL, _OTHER, _WIDE = range(6)
+
+def _char_class(c):
+    # Same order as the original c.isalpha / isdigit / isspace / not isalnum chain
+    if c.isalpha():
+        return _LETTER
+    if c.isdigit():
+        return _DIGIT
+    if c.isspace():
+        return _SPACE
+    if not c.isalnum():
+        return _SPECIAL
+    return _OTHER
+
+# One class id per Latin-1 code point, plus a last entry (WIDE) standing for everything above U+00FF
+_CHAR_CLASS = np.array([_char_class(chr(i)) for i in range(256)] + [_WIDE], dtype=np.uint8)
+
+if njit is not None:
+    @njit(cache=True)
+    def _classify_codes(codes, class_lut):
+        # Branchless: each code point, clamped to the table's last entry, bumps exactly one class counter
+        class_counts = np.zeros(6, dtype=np.int64)
+        newlines = 0
+        last = class_lut.size - 1
+        for i in range(codes.size):
+            c = codes[i]
+            class_counts[class_lut[min(c, last)]] += 1
+            newlines += c == 10
+        return class_counts, newlines
+
+def _fold_classes(per_code):
+    # Per-code-point counts for U+0000..U+00FF -> per-class counts
+    class_counts = np.zeros(6, dtype=np.int64)
+    np.add.at(class_counts, _CHAR_CLASS[:256], per_code)
+    return class_counts
+
+def _class_stats(class_counts, newlines):
+    return {
+        'letters': int(class_counts[_LETTER]),
+        'digits': int(class_counts[_DIGIT]),
+        'spaces': int(class_counts[_SPACE]),
+        'special': int(class_counts[_SPECIAL]),
+        'newlines': int(newlines),
+    }
+
+def count_char_classes(text):
+    # Same buckets as c.isalpha / isdigit / isspace / not isalnum, tallied without a Python loop per character,
+    # plus the newline count.
+    try:
+        # Latin-1 text encodes to one byte per character, each byte equal to its code point,
+        # so the class table covers all of it
+        latin1 = np.frombuffer(text.encode('latin-1'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return _count_char_classes_wide(text)
+    # The bincount already holds the newline tally; no second pass with str.count
+    per_code = np.bincount(latin1, minlength=256)
+    return _class_stats(_fold_classes(per_code), per_code[ord('\n')])
+
+def _count_char_classes_wide(text):
+    # Text with characters beyond Latin-1: table lookup up to U+00FF, the rest classified by distinct value
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    if njit is not None:
+        class_counts, newlines = _classify_codes(codes, _CHAR_CLASS)
+        others = codes[codes >= 256] if class_counts[_WIDE] else codes[:0]
+    else:
+        is_latin1 = codes < 256
+        per_code = np.bincount(codes[is_latin1], minlength=256)
+        class_counts = _fold_classes(per_code)
+        newlines = per_code[ord('\n')]
+        others = codes[~is_latin1]
+    # Wide text has few distinct characters; classify each one once and weight by its count
+    others, counts = np.unique(others, return_counts=True)
+    for code, count in zip(others.tolist(), counts.tolist()):
+        class_counts[_char_class(chr(code))] += count
+    return _class_stats(class_counts, newlines)
+
+def whole_sentences(sample, trim_start=True, trim_end=True):
+    # Trims a slice cut out of the middle of a document to the sentences it fully contains,
+    # so langdetect is not fed half-words. Only the slice is scanned, never the whole text.
+    ends = [m.end() for m in _SENT_RE.finditer(sample)]
+    if not ends:
+        return sample
+    start = ends[0] if trim_start else 0
+    stop = ends[-1] if trim_end else len(sample)
+    trimmed = sample[start:stop]
+    return trimmed if trimmed.strip() else sample  # Not even one whole sentence: use the raw slice
+
+@lru_cache(maxsize=1024)
+def _safe_detect(sample):
+    # Detection is seeded, so repeated samples (e.g. re-opening a file) reuse the earlier answer
+    try:
+        return detect(sample)
+    except Exception:
+        return None
+
+def parse_keywords(text):
+    # Comma-separated keywords or phrases, lowercased, in input order without repeats
+    return tuple(dict.fromkeys(k.strip().lower() for k in text.split(',') if k.strip()))
+
+def _is_word_char(c):
+    # Same test as \w in a Unicode pattern
+    return c.isalnum() or c == '_'
+
+class KeywordCounter:
+    # Whole-word occurrences of each keyword: the characters on either side must not be word characters.
+    # Fed the same whitespace-terminated pieces as the word count, so no keyword can end at a cut.
+    def __init__(self, keywords):
+        self.counts = dict.fromkeys(keywords, 0)
+        self.tail = ""  # End of the text already scanned, so a phrase spanning two pieces is still found
+        self.tail_len = max(map(len, keywords))
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                self.automaton.add_word(keyword, keyword)
+            self.automaton.make_automaton()
+        else:
+            # One scan per keyword; the lookahead lets occurrences overlap, as the automaton's do
+            self.automaton = None
+            self.patterns = [(keyword, re.compile(r'(?<!\w)(?=(' + re.escape(keyword) + r')(?!\w))'))
+                             for keyword in keywords]
+
+    def update(self, text):
+        buf = self.tail + text.lower()
+        seen = len(self.tail)  # Matches ending inside the tail were counted last time
+        if self.automaton is not None:
+            for last, keyword in self.automaton.iter(buf):
+                start = last + 1 - len(keyword)
+                if last < seen:
+                    continue
+                if start > 0 and _is_word_char(buf[start - 1]):
+                    continue
+                if last + 1 < len(buf) and _is_word_char(buf[last + 1]):
+                    continue
+                self.counts[keyword] += 1
+        else:
+            for keyword, pattern in self.patterns:
+                self.counts[keyword] += sum(1 for m in pattern.finditer(buf) if m.end(1) > seen)
+        self.tail = buf[-self.tail_len:]
+
+class TextStats:
+    # Running totals for one document, fed chunk by chunk so a large file never has to sit in memory whole.
+    def __init__(self, keywords=()):
+        self.keywords = KeywordCounter(keywords) if keywords else None
+        self.stats = dict.fromkeys(('letters', 'digits', 'spaces', 'special', 'newlines'), 0)
+        self.word_counts = Counter()
+        self.carry = ""  # Text after the last whitespace, which may be a token cut in half
+        self.length = 0
+        # Language samples: start, the middle of each chunk, and the end of the document
+        self.head = ""
+        self.middles = []
+        self.tail = ""
+
+    def update(self, chunk):
+        if not chunk:
+            return
+        self.length += len(chunk)
+
+        # Vectorized character analysis
+        for key, count in count_char_classes(chunk).items():
+            self.stats[key] += count
+
+        if len(self.head) < 3 * _LANG_SAMPLE_CHARS:
+            self.head += chunk[:3 * _LANG_SAMPLE_CHARS - len(self.head)]
+        mid = len(chunk) // 2
+        self.middles.append(chunk[mid:mid + _LANG_SAMPLE_CHARS])
+        self.tail = (self.tail + chunk[-_LANG_SAMPLE_CHARS:])[-_LANG_SAMPLE_CHARS:]
+
+        # Tokens never contain whitespace, so cutting there gives the same matches as one whole-text scan
+        # (any whitespace: a chunk with only tabs, \r or \u3000 must not be carried whole)
+        m = _LAST_SPACE_RE.search(chunk)
+        if m is None:
+            self.carry += chunk  # No whitespace at all: still inside one token
+            return
+        cut = m.start() + 1
+        self._count_words(self.carry + chunk[:cut])
+        self.carry = chunk[cut:]
+
+    def _count_words(self, text):
+        if self.keywords is not None:
+            self.keywords.update(text)
+        # Word analysis with improved regex
+        word_re = _WORD_RE2 if _WORD_RE2 is not None and text.isascii() else _WORD_RE
+        # Lowercase the matched tokens only, not a full copy of the document;
+        # finditer + Counter tallies them in C without building a token list
+        tokens = map(methodcaller('group'), word_re.finditer(text))
+        self.word_counts.update(map(str.lower, tokens))
+
+    def language_samples(self):
+        # Start, middle and end of the document: detect() runs a few times instead of once per sentence,
+        # and a file that switches language part-way still reports more than one.
+        if self.length <= 3 * _LANG_SAMPLE_CHARS:
+            return [self.head]
+        return [
+            whole_sentences(self.head[:_LANG_SAMPLE_CHARS], trim_start=False),
+            whole_sentences(self.middles[len(self.middles) // 2]),
+            whole_sentences(self.tail, trim_end=False),
+        ]
+
+    def finish(self):
+        # Final stats dict, or None when no text was seen
+        if not self.length:
+            return None
+        self._count_words(self.carry)
+        self.carry = ""
+
+        stats = self.stats
+        stats['words'] = sum(self.word_counts.values())
+        stats['unique_words'] = len(self.word_counts)
+
+        # Language detection with sampling
+        detected_langs = set()
+        for sample in self.language_samples():
+            sample = sample.strip()
+            if len(sample) >= 3:
+                lang = _safe_detect(sample)
+                if lang is not None:
+                    detected_langs.add(lang)
+
+        stats['languages'] = detected_langs
+        stats['lines'] = stats.pop('newlines') + 1
+        stats['keywords'] = self.keywords.counts if self.keywords is not None else {}
+
+        return dict(stats)
+
+# Readers live at module level so they can run in the analysis process.
+# Each takes the file path and a report(percent) callback, and yields the text in pieces
+# so the full document never has to exist as one string.
+def read_pdf(path, report):
+    if fitz is not None:
+        yield from _read_pdf_mupdf(path, report)
+        return
+    with open(path, "rb") as f:
+        total = len(PyPDF2.PdfReader(f).pages)
+    pages_done = 0
+    progress_lock = threading.Lock()
+
+    def read_pages(start, stop):
+        # Each range opens its own reader: a PdfReader shares one file position and is not thread-safe
+        nonlocal pages_done
+        buf = io.StringIO()
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            for i in range(start, stop):
+                if i > start:
+                    buf.write("\n")
+                buf.write(reader.pages[i].extract_text() or "")
+                with progress_lock:
+                    pages_done += 1
+                    report(int(pages_done/total*100))
+        return buf.getvalue()
+
+    if total < _PARALLEL_PDF_MIN_PAGES:
+        yield read_pages(0, total)
+        return
+
+    # Pages are independent once parsed; give each thread one contiguous range
+    workers = min(8, os.cpu_count() or 1, total)
+    step = -(-total // workers)
+    starts = range(0, total, step)
+    with ThreadPoolExecutor(max_workers=len(starts)) as executor:
+        # Ranges come back in page order, each as one string
+        for i, text in enumerate(executor.map(lambda start: read_pages(start, min(start + step, total)), starts)):
+            if i:
+                yield "\n"
+            yield text
+
+def _read_pdf_mupdf(path, report):
+    # Sequential: MuPDF is not thread-safe, and its C extraction is already fast
+    with fitz.open(path) as doc:
+        total = doc.page_count
+        for i, page in enumerate(doc):
+            if i:
+                yield "\n"
+            yield page.get_text()
+            report(int((i+1)/total*100))
+
+def read_docx(path, report):
+    doc = docx.Document(path)
+    for i, para in enumerate(doc.paragraphs):
+        if i:
+            yield "\n"
+        yield para.text
+
+def batched_text(pieces, size=_CHUNK_CHARS):
+    # Joins small pieces (pages, paragraphs) into chunks of about size characters, so the
+    # per-chunk analysis cost is paid a few times per document instead of once per paragraph
+    batch = []
+    length = 0
+    for piece in pieces:
+        batch.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(batch)
+            batch = []
+            length = 0
+    if batch:
+        yield "".join(batch)
+
+def read_txt(path, report):
+    # Yields the file in chunks so analysis and progress run while it is read
+    total = os.path.getsize(path) or 1
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(_CHUNK_CHARS)
+            if not chunk:
+                break
+            yield chunk
+            report(min(100, int(f.buffer.tell()/total*100)))
+
+_READERS = {
+    '.pdf': read_pdf,
+    '.docx': read_docx,
+    '.txt': read_txt
+}
+
+# Analysis runs in one long-lived worker process: it is CPU-bound Python, and in a QThread it
+# would hold the GIL against the GUI. Spawned rather than forked, since the GUI process has threads.
+_MP_CONTEXT = multiprocessing.get_context('spawn')
+_analysis_pool = None
+_progress_queue = None
+_job_ids = itertools.count()
+
+def _init_analysis_process(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+def _analyze_file(path, ext, job, keywords):
+    # Runs in the analysis process; progress is tagged with the job so stale updates can be dropped
+    last_value = -1
+
+    def report(value):
+        # Only changes are sent: a 5000-page PDF would otherwise queue 5000 updates for 100 distinct values
+        nonlocal last_value
+        if value != last_value:
+            last_value = value
+            _progress_queue.put((job, value))
+
+    stats = TextStats(keywords)
+    for chunk in batched_text(_READERS[ext](path, report)):
+        stats.update(chunk)
+    return stats.finish()
+
+def _analysis_executor():
+    # Started on first use; analyses run one at a time, so a single worker is enough
+    global _analysis_pool, _progress_queue
+    if _analysis_pool is None:
+        _progress_queue = _MP_CONTEXT.Queue()
+        _analysis_pool = ProcessPoolExecutor(max_workers=1, mp_context=_MP_CONTEXT,
+                                             initializer=_init_analysis_process,
+                                             initargs=(_progress_queue,))
+    return _analysis_pool, _progress_queue
+
 class FileProcessor(QThread):
     progress_updated = pyqtSignal(int)
     analysis_complete = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, keywords=()):
         super().__init__()
         self.file_path = file_path
-        self.readers = {
-            '.pdf': self.read_pdf,
-            '.docx': self.read_docx,
-            '.txt': self.read_txt
-        }
+        self.keywords = keywords
+        # Derived once; the window reads the name again when the run finishes
+        self.ext = os.path.splitext(file_path)[1].lower()
+        self.basename = os.path.basename(file_path)
 
     def run(self):
+        global _analysis_pool
         try:
-            ext = os.path.splitext(self.file_path)[1].lower()
-            if ext not in self.readers:
+            if self.ext not in _SUPPORTED_EXTS:
                 self.error_occurred.emit("Unsupported file format")
                 return
 
-            text = self.readers[ext]()
-            if not text:
+            executor, progress_queue = _analysis_executor()
+            job = next(_job_ids)
+            future = executor.submit(_analyze_file, self.file_path, self.ext, job, self.keywords)
+            # This thread only relays progress from the worker process until the result is in
+            while True:
+                try:
+                    msg_job, value = progress_queue.get(timeout=0.05)
+                except queue.Empty:
+                    if future.done():
+                        break
+                    continue
+                if msg_job == job:
+                    self.progress_updated.emit(value)
+
+            result = future.result()
+            if result is None:
                 self.error_occurred.emit("File is empty or cannot be read")
                 return
 
-            result = self.analyze_text(text)
             self.analysis_complete.emit(result)
 
+        except BrokenProcessPool:
+            _analysis_pool = None  # Start a fresh worker next time
+            self.error_occurred.emit("Analysis process stopped unexpectedly")
         except Exception as e:
             self.error_occurred.emit(str(e))
 
-    def read_pdf(self):
-        text = []
-        with open(self.file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            total = len(reader.pages)
-            for i, page in enumerate(reader.pages):
-                text.append(page.extract_text() or "")
-                self.progress_updated.emit(int((i+1)/total*100))
-        return "\n".join(text)
-
-    def read_docx(self):
-        doc = docx.Document(self.file_path)
-        return "\n".join(para.text for para in doc.paragraphs)
-
-    def read_txt(self):
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            return f.read()
-
-    def analyze_text(self, text):
-        stats = defaultdict(int)
-        word_counts = defaultdict(int)
-        detected_langs = set()
-        sentences = re.split(r'[.!?]+', text)
-        word_re = re.compile(r"\b\w[\w'-]*\b", re.UNICODE)
-
-        # Single pass character analysis
-        for c in text:
-            if c.isalpha():
-                stats['letters'] += 1
-            elif c.isdigit():
-                stats['digits'] += 1
-            elif c.isspace():
-                stats['spaces'] += 1
-            elif not c.isalnum():
-                stats['special'] += 1
-
-        # Word analysis with improved regex
-        words = word_re.findall(text.lower())
-        stats['words'] = len(words)
-        stats['unique_words'] = len(set(words))
-
-        # Language detection with sampling
-        sample_size = min(100, len(sentences))
-        for sentence in sentences[:sample_size]:
-            sentence = sentence.strip()
-            if len(sentence) >= 3:
-                try:
-                    lang = detect(sentence)
-                    detected_langs.add(lang)
-                except Exception:
-                    pass
-
-        stats['languages'] = detected_langs
-        stats['lines'] = text.count('\n') + 1
-
-        return dict(stats)
-
 class TextAnalyzerApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -120,6 +499,10 @@ class TextAnalyzerApp(QMainWindow):
         self.file_label = QLabel("No file selected")
         self.btn_open = QPushButton("Open File")
         self.btn_open.clicked.connect(self.open_file)
+
+        # Optional keyword tally
+        self.keyword_input = QLineEdit()
+        self.keyword_input.setPlaceholderText("Keywords to count, comma-separated (optional)")
         
         # Progress bar
         self.progress = QProgressBar()
@@ -131,6 +514,7 @@ class TextAnalyzerApp(QMainWindow):
 
         layout.addWidget(self.btn_open)
         layout.addWidget(self.file_label)
+        layout.addWidget(self.keyword_input)
         layout.addWidget(self.progress)
         layout.addWidget(self.results)
 
@@ -141,14 +525,14 @@ class TextAnalyzerApp(QMainWindow):
         )
         if file_path:
             self.current_file = file_path
-            self.file_label.setText(f"Analyzing: {os.path.basename(file_path)}")
             self.start_analysis(file_path)
 
     def start_analysis(self, file_path):
         self.progress.show()
         self.btn_open.setEnabled(False)
 
-        self.worker = FileProcessor(file_path)
+        self.worker = FileProcessor(file_path, parse_keywords(self.keyword_input.text()))
+        self.file_label.setText(f"Analyzing: {self.worker.basename}")
         self.worker.progress_updated.connect(self.update_progress)
         self.worker.analysis_complete.connect(self.show_results)
         self.worker.error_occurred.connect(self.show_error)
@@ -170,6 +554,9 @@ class TextAnalyzerApp(QMainWindow):
             f"Languages Detected: {len(results['languages'])}\n"
             f"Detected Languages: {', '.join(results['languages']) or 'None'}"
         )
+        if results['keywords']:
+            text += "\n\nKeyword Counts:\n" + "\n".join(
+                f"{keyword}: {count}" for keyword, count in results['keywords'].items())
         self.results.setPlainText(text)
 
     def show_error(self, message):
@@ -178,7 +565,7 @@ class TextAnalyzerApp(QMainWindow):
     def analysis_finished(self):
         self.progress.hide()
         self.btn_open.setEnabled(True)
-        self.file_label.setText(f"Analyzed: {os.path.basename(self.current_file)}")
+        self.file_label.setText(f"Analyzed: {self.worker.basename}")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)